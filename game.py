@@ -2,8 +2,7 @@ from typing import Optional
 from enum import IntEnum
 from random import randint
 from time import sleep
-from copy import deepcopy, copy
-from operator import itemgetter
+from math import inf
 from collections import deque
 from tkinter import *
 
@@ -11,51 +10,101 @@ class Player(IntEnum):
     X = 0
     O = 1
 
-Board = list[list[Optional[Player]]]
-
 chars: dict[Optional[Player], str] = {
     Player.X: "X",
     Player.O: "O",
     None: " "
 }
 
-def filled_equal(x: list):
-    # Returns if a list is filled with equal elements != None
-    for item in x:
-        if item is None: return False
-        if item != x[0]: return False
-    return True
+# Cell (row, col) is stored in bit 3*row + col of a player's bitboard
+WIN_MASKS = (
+    0b111000000, 0b000111000, 0b000000111, # Rows
+    0b100100100, 0b010010010, 0b001001001, # Columns
+    0b100010001, 0b001010100,              # Diagonals
+)
+
+# The 8 symmetries of the board (rotations and reflections)
+# PERMS[k][i] is where symmetry k sends the cell in bit i
+SYMMETRIES = (
+    lambda r, c: (r, c),
+    lambda r, c: (c, 2-r),
+    lambda r, c: (2-r, 2-c),
+    lambda r, c: (2-c, r),
+    lambda r, c: (r, 2-c),
+    lambda r, c: (2-r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (2-c, 2-r),
+)
+PERMS = tuple(tuple(3*r + c for r, c in (sym(i//3, i%3) for i in range(9))) for sym in SYMMETRIES)
+INV_PERMS = tuple(tuple(perm.index(i) for i in range(9)) for perm in PERMS)
+
+def permute(bits: int, perm: tuple[int, ...]) -> int:
+    out = 0
+    for i in range(9):
+        if bits & (1 << i): out |= 1 << perm[i]
+    return out
+
+# PERMUTED[k][bits] is permute(bits, PERMS[k]), precomputed for all 512 bitboards
+PERMUTED = tuple(tuple(permute(bits, perm) for bits in range(512)) for perm in PERMS)
+
+def canon(x_bits: int, o_bits: int) -> tuple[int, int, int]:
+    # Smallest symmetric image of a position, so equivalent boards share a key
+    # Also returns the index of the symmetry that produces it
+    return min((table[x_bits], table[o_bits], k) for k, table in enumerate(PERMUTED))
+
+# Center first, then corners, then edges: likely best moves come first for alpha-beta
+MOVE_ORDER = ((1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1))
 
 # Info about the game
 class GameContext:
     def __init__(self):
         self.moves = 0
-        self.board: Board = [[None for _ in range(3)] for _ in range(3)]
+        self.x_bits = 0
+        self.o_bits = 0
         self.turn = Player.O
 
+    def cell(self, row, col) -> Optional[Player]:
+        bit = 1 << (3*row + col)
+        if self.x_bits & bit: return Player.X
+        if self.o_bits & bit: return Player.O
+        return None
+
     def possible_moves(self) -> tuple[tuple[int, int]]:
-        return tuple(((i, j) for i in range(3) for j in range(3) if self.board[i][j] is None))
+        occupied = self.x_bits | self.o_bits
+        return tuple(((r, c) for r, c in MOVE_ORDER if not occupied & (1 << (3*r + c))))
 
     def update(self, row, col):
         self.moves += 1
-        self.board[row][col] = self.turn
+        bit = 1 << (3*row + col)
+        if self.turn == Player.X: self.x_bits |= bit
+        else: self.o_bits |= bit
         self.turn = Player(1 - self.turn)
 
+    def undo(self, row, col, prev_turn):
+        # Reverts an update, so searches can explore moves in place
+        self.moves -= 1
+        bit = 1 << (3*row + col)
+        self.x_bits &= ~bit
+        self.o_bits &= ~bit
+        self.turn = prev_turn
+
     def is_game_over(self) -> tuple[bool, Optional[Player]]:
         # Checks if a game is over
         # Also returns the winning player or None if it's a draw
-        for row in self.board:
-            if filled_equal(row): return (True, row[0])
-        cols = list(map(list, zip(*self.board)))
-        for col in cols:
-            if filled_equal(col): return (True, col[0])
-        diag1 = [self.board[i][i] for i in range(3)]
-        diag2 = [self.board[2-i][i] for i in range(3)]
-        if filled_equal(diag1): return (True, diag1[0])
-        if filled_equal(diag2): return (True, diag2[0])
+        # Only the player who just moved can have completed a line
+        if self.turn == Player.O: last, bits = Player.X, self.x_bits
+        else: last, bits = Player.O, self.o_bits
+        for mask in WIN_MASKS:
+            if bits & mask == mask: return (True, last)
         if self.moves == 9: return (True, None)
         return (False, None)
 
+# Kind of score stored in a transposition table entry
+class Bound(IntEnum):
+    EXACT = 0
+    LOWER = 1 # True score is >= the stored one
+    UPPER = 2 # True score is <= the stored one
+
 # Bot
 class Bot:
     def __init__(self, p: Player):
@@ -67,40 +116,72 @@ class Bot:
 # A bot that plays random moves
 class RandomBot(Bot):
     def predict_move(self, ctx: GameContext) -> tuple[int, int]:
-        row = randint(0, 2)
-        col = randint(0, 2)
-        if ctx.board[row][col] is None: return (row, col)
-        else: return self.predict_move(ctx)
+        moves = ctx.possible_moves()
+        return moves[randint(0, len(moves) - 1)]
 
 class MinimaxBot(Bot):
     def __init__(self, p, max_depth):
         super().__init__(p)
         self.max_depth = max_depth
+        # Transposition table: (*canon(x_bits, o_bits), turn) -> (score, bound, best move)
+        # The best move is stored as a bit index in the canonical board
+        # Scores only depend on the position, so it stays valid across games
+        self.tt = {}
 
-    def minimax(self, curr_ctx: GameContext, depth: int):
-        # Following pseudocode in https://www.neverstopbuilding.com/blog/minimax
+    def negamax(self, curr_ctx: GameContext, depth: int, alpha: float, beta: float, color: int):
+        # Minimax where scores are always seen by the side to move (color is +1 for the bot)
+        # with alpha-beta pruning: subtrees that can't change the result are skipped
         over, winner = curr_ctx.is_game_over()
         if over:
-            if winner == self.player: return 10
-            elif winner == Player(1 - self.player): return -10
+            # Faster wins (and slower losses) score better, which tightens the cutoffs
+            empty = 9 - curr_ctx.moves
+            if winner == self.player: return color * (10 + empty)
+            elif winner == Player(1 - self.player): return -color * (10 + empty)
             elif winner is None: return 0
-        
+
+        # The root is always searched, since it has to pick a move
+        x_bits, o_bits, sym = canon(curr_ctx.x_bits, curr_ctx.o_bits)
+        key = (x_bits, o_bits, curr_ctx.turn)
         moves = curr_ctx.possible_moves()
-        scores = []
+        if key in self.tt:
+            value, bound, tt_move = self.tt[key]
+            if depth != self.max_depth:
+                if bound == Bound.EXACT: return value
+                elif bound == Bound.LOWER: alpha = max(alpha, value)
+                elif bound == Bound.UPPER: beta = min(beta, value)
+                if alpha >= beta: return value
+            # Try the previous best move first
+            i = INV_PERMS[sym][tt_move]
+            tt_move = (i//3, i%3)
+            moves = (tt_move, *(move for move in moves if move != tt_move))
+        alpha_orig = alpha
+
+        best = -inf
         for move in moves:
-            new_ctx = deepcopy(curr_ctx)
-            new_ctx.update(*move)
-            scores.append(self.minimax(new_ctx, depth-1))
-        
-        if curr_ctx.turn == self.player:
-            score, move = max(zip(scores, moves), key=itemgetter(0))
-        else:
-            score, _ = min(zip(scores, moves), key=itemgetter(0))
-        if depth == self.max_depth: self.move = move
-        return score
+            prev_turn = curr_ctx.turn
+            curr_ctx.update(*move)
+            score = -self.negamax(curr_ctx, depth-1, -beta, -alpha, -color)
+            curr_ctx.undo(*move, prev_turn)
+            if score > best:
+                best, best_move = score, move
+                alpha = max(alpha, best)
+                if alpha >= beta: break
+
+        if depth == self.max_depth: self.move = best_move
+        best_move = PERMS[sym][3*best_move[0] + best_move[1]]
+        if best <= alpha_orig: self.tt[key] = (best, Bound.UPPER, best_move)
+        elif best >= beta: self.tt[key] = (best, Bound.LOWER, best_move)
+        else: self.tt[key] = (best, Bound.EXACT, best_move)
+        return best
     
     def predict_move(self, curr_ctx):
-        self.minimax(curr_ctx, self.max_depth)
+        # Exact entries in the table already hold an optimal move
+        x_bits, o_bits, sym = canon(curr_ctx.x_bits, curr_ctx.o_bits)
+        entry = self.tt.get((x_bits, o_bits, curr_ctx.turn))
+        if entry is not None and entry[1] == Bound.EXACT:
+            i = INV_PERMS[sym][entry[2]]
+            return (i//3, i%3)
+        self.negamax(curr_ctx, self.max_depth, -inf, inf, 1)
         return self.move
 
 # Class that contains all game and GUI contexts
@@ -110,12 +191,6 @@ class Application:
         self.tk = Tk()
         self.tk.title("Tic-tac-toe")
         
-        # Manages if the main loop should finish
-        self.quit = False
-        def quit():
-            self.quit = True
-        self.tk.protocol("WM_DELETE_WINDOW", quit)
-        
         # Window and board geometry
         self.window_height = 600
         self.board_size = 500 # Square
@@ -131,7 +206,7 @@ class Application:
         # Text area
         self.text_area = Label(self.tk, text="Tic-tac-toe!")
         self.text_area.pack()
-        self.text_area.config(font=("Courier", 200))
+        self.text_area.config(font=("Courier", 16))
         self.tk.update()
         self.text_area.place(x=self.board_size/2 - self.text_area.winfo_width()/2, y=self.board_size + 30)
         
@@ -145,6 +220,9 @@ class Application:
         self.canvas.create_line(0, self.board_size/3, self.board_size, self.board_size/3, width=8)
         self.canvas.create_line(0, self.board_size*2/3, self.board_size, self.board_size*2/3, width=8)
 
+        # One bot per side, kept across games so their transposition tables are reused
+        self._bot_cache = {p: MinimaxBot(p, max_depth=8) for p in Player}
+
         # Initialize game context
         self.reset_game()
 
@@ -154,15 +232,15 @@ class Application:
             col = int(event.x // self.cell_size)
             row = int(event.y // self.cell_size)
             if row not in range(3) or col not in range(3): return
-            if self.accept_user_input and self.ctx.board[row][col] is None:
+            if self.accept_user_input and self.ctx.cell(row, col) is None:
                 # Valid mouse events will update the game context
                 self.update_canvas(row, col)
                 self.ctx.update(row, col)
 
-                if self.ctx.is_game_over()[0]:
+                over, winning_player = self.ctx.is_game_over()
+                if over:
                     # Check if game has ended to freeze the game context
                     self.accept_user_input = False
-                    winning_player = self.ctx.is_game_over()[1]
                     message = "Draw!" if winning_player is None else f"{chars[winning_player]} wins!"
                     self.text_area.config(text=message)
                 else:
@@ -172,9 +250,9 @@ class Application:
                     # Update game context after bot move
                     self.update_canvas(row, col)
                     self.ctx.update(row, col)
-                    if self.ctx.is_game_over()[0]:
+                    over, winning_player = self.ctx.is_game_over()
+                    if over:
                         self.accept_user_input = False
-                        winning_player = self.ctx.is_game_over()[1]
                         message = "Draw!" if winning_player is None else f"{chars[winning_player]} wins!"
                         self.text_area.config(text=message)
         
@@ -193,9 +271,9 @@ class Application:
             self.canvas.delete(id)
         self.drawn_ids = []
 
-        # Instantiate bot
+        # Pick bot
         self.user_player = Player(randint(0, 1))
-        self.bot = MinimaxBot(Player(1 - self.user_player), max_depth=8)
+        self.bot = self._bot_cache[Player(1 - self.user_player)]
         if self.user_player == Player.X:
             row = randint(0, 2)
             col = randint(0, 2)
@@ -223,14 +301,8 @@ class Application:
 
 def main():
     app = Application()
-    while True:
-        # Update window context
-        app.tk.update()
-        app.tk.update_idletasks()
-        
-        # Check if user closed window
-        if app.quit:
-            break
-    
+    # Tk's event loop blocks until there are events and exits when the window is closed
+    app.tk.mainloop()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file